@@ -2,24 +2,147 @@
 Agent Orchestrator
 Main agent logic that coordinates tools and generates forecasts
 """
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
 from tools.financial_extractor import extract_financial_data
 from tools.qualitative_analysis import analyze_transcripts
 from tools.market_data import fetch_market_data
-from agent.prompts import AGENT_SYSTEM_PROMPT
+from agent.prompts import AGENT_SYSTEM_PROMPT, SYNTHESIS_PROMPT_TEMPLATE
 from utils.llm_provider import get_llm, get_provider_name
-import json
+from utils.json_stream import stream_json_object, JsonObjectTracker, PartialStreamError
+from cachetools import TLRUCache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+import copy
 import logging
+import orjson
 import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# NSE trading session (09:15-15:30 IST) expressed in UTC
+MARKET_OPEN_UTC = time(3, 45)
+MARKET_CLOSE_UTC = time(10, 0)
+MARKET_DATA_TTL = 60  # seconds, while the market is open
+OFF_HOURS_MARKET_DATA_TTL = 900  # seconds, quotes don't move after close
+
+
+def _seconds_until_open(utc_now: datetime) -> float:
+    """Seconds from utc_now until the next weekday session opens"""
+    next_open = datetime.combine(utc_now.date(), MARKET_OPEN_UTC, tzinfo=timezone.utc)
+    if utc_now >= next_open:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    return (next_open - utc_now).total_seconds()
+
+
+def _market_data_expiry(_key, _value, now: float) -> float:
+    """
+    Expiry time for a cached quote - short intraday, longer off-hours but
+    never past the next session open
+    """
+    utc_now = datetime.now(timezone.utc)
+    is_open = (
+        utc_now.weekday() < 5
+        and MARKET_OPEN_UTC <= utc_now.time() < MARKET_CLOSE_UTC
+    )
+    if is_open:
+        return now + MARKET_DATA_TTL
+    return now + min(OFF_HOURS_MARKET_DATA_TTL, _seconds_until_open(utc_now))
+
+
+_market_data_cache = TLRUCache(maxsize=32, ttu=_market_data_expiry)
+_market_data_lock = threading.Lock()
+
+# Patterns for locating a fenced JSON block in LLM output, tried in order
+_JSON_PATTERNS = [
+    re.compile(p, re.DOTALL) for p in (
+        r'```json\s*(\{.*?\})\s*```',
+        r'```\s*(\{.*?\})\s*```',
+    )
+]
+
+
+def _scan_json_object(text: str):
+    """
+    Find the first balanced top-level {...} block in text
+    
+    Single linear pass that ignores braces inside string literals,
+    so parse time stays bounded regardless of LLM output.
+    
+    Args:
+        text: Raw text output from LLM
+    
+    Returns:
+        Substring containing the object, or None if no balanced block exists
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    tracker = JsonObjectTracker()
+    for i, char in enumerate(text[start:], start):
+        if tracker.feed(char):
+            return text[start:i + 1]
+    
+    return None
+
+
+@lru_cache(maxsize=32)
+def _parse_json_text(text: str):
+    """
+    Parse a JSON object out of LLM output, trying cheapest strategies first
+    
+    Cached so identical output (e.g. a retried request) is only parsed once.
+    
+    Args:
+        text: Raw text output from LLM
+    
+    Returns:
+        Parsed JSON dictionary, or None if no object could be parsed
+    """
+    # Only attempt a direct parse when the output is plausibly clean JSON
+    stripped = text.strip()
+    if stripped.startswith('{'):
+        try:
+            return orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            pass
+    
+    # Look for JSON between ```json and ``` or just ``` fences
+    for pattern in _JSON_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            try:
+                return orjson.loads(match.group(1))
+            except orjson.JSONDecodeError:
+                continue
+    
+    # Scan for the first balanced object
+    candidate = _scan_json_object(text)
+    if candidate:
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            pass
+    
+    # Last resort: try to extract just the outer braces
+    start = text.find('{')
+    end = text.rfind('}')
+    if start != -1 and end != -1:
+        try:
+            return orjson.loads(text[start:end+1])
+        except orjson.JSONDecodeError:
+            pass
+    
+    return None
+
 
 class ForecastOrchestrator:
     """
     Orchestrates the forecasting process using multiple tools
-    Simple sequential approach - works better with Ollama
+    Fixed tool pipeline (no agent reasoning) - works better with Ollama
     """
     
     def __init__(self, reports_dir: str = "data/reports", 
@@ -38,7 +161,7 @@ class ForecastOrchestrator:
     def generate_forecast(self, task: str) -> dict:
         """
         Generate forecast based on task description
-        Uses simple sequential tool execution (better for Ollama)
+        Runs the data-gathering tools concurrently, then synthesizes with the LLM
         
         Args:
             task: The forecasting task
@@ -52,91 +175,48 @@ class ForecastOrchestrator:
             tools_used = []
             tool_outputs = []
             
-            # Step 1: Extract financial data
-            logger.info("Step 1: Extracting financial data...")
-            try:
-                financial_data = extract_financial_data(self.reports_dir)
-                tool_outputs.append(f"Financial Data:\n{financial_data}")
-                tools_used.append("financial_data_extractor")
-                logger.info("✅ Financial data extracted")
-            except Exception as e:
-                logger.warning(f"Financial extraction failed: {e}")
-                tool_outputs.append(f"Financial Data: Not available - {str(e)}")
-            
-            # Step 2: Analyze transcripts
-            logger.info("Step 2: Analyzing earnings transcripts...")
-            try:
-                # Create a relevant query from the task
-                transcript_query = self._extract_transcript_query(task)
-                transcript_analysis = analyze_transcripts(transcript_query)
-                tool_outputs.append(f"Transcript Analysis:\n{transcript_analysis}")
-                tools_used.append("qualitative_analysis")
-                logger.info("✅ Transcripts analyzed")
-            except Exception as e:
-                logger.warning(f"Transcript analysis failed: {e}")
-                tool_outputs.append(f"Transcript Analysis: Not available - {str(e)}")
+            # Steps 1-3 are independent I/O-bound tool calls, so run them
+            # concurrently and collect results in a fixed order
+            transcript_query = self._extract_transcript_query(task)
+            steps = [
+                ("financial_data_extractor", "Financial Data",
+                 extract_financial_data, self.reports_dir),
+                ("qualitative_analysis", "Transcript Analysis",
+                 analyze_transcripts, transcript_query),
+                ("market_data", "Market Data",
+                 self._cached_market_data, "TCS.NS"),
+            ]
             
-            # Step 3: Get market data (optional)
-            logger.info("Step 3: Fetching market data...")
-            try:
-                market_data = fetch_market_data("TCS.NS")
-                tool_outputs.append(f"Market Data:\n{market_data}")
-                tools_used.append("market_data")
-                logger.info("✅ Market data fetched")
-            except Exception as e:
-                logger.warning(f"Market data fetch failed: {e}")
-                tool_outputs.append(f"Market Data: Not available - {str(e)}")
+            logger.info("Steps 1-3: Running tools concurrently...")
+            with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+                futures = [
+                    executor.submit(func, arg) for _, _, func, arg in steps
+                ]
+                
+                for (tool_name, label, _, _), future in zip(steps, futures):
+                    try:
+                        output = future.result()
+                        tool_outputs.append(f"{label}:\n{output}")
+                        tools_used.append(tool_name)
+                        logger.info(f"✅ {label} complete")
+                    except Exception as e:
+                        logger.warning(f"{label} failed: {e}")
+                        tool_outputs.append(f"{label}: Not available - {str(e)}")
             
             # Step 4: Synthesize with LLM
             logger.info("Step 4: Synthesizing forecast with LLM...")
             combined_data = "\n\n".join(tool_outputs)
             
-            synthesis_prompt = f"""Based on the following data about TCS, generate a comprehensive forecast.
-
-Task: {task}
-
-Available Data:
-{combined_data}
-
-Generate a forecast as a JSON object with this exact structure:
-{{
-    "summary": "2-3 sentence executive summary",
-    "financial_trends": [
-        {{
-            "metric": "Revenue/Profit/Margin",
-            "trend": "increasing/decreasing/stable",
-            "percentage_change": 5.2,
-            "analysis": "Brief explanation"
-        }}
-    ],
-    "management_outlook": {{
-        "sentiment": "positive/negative/neutral",
-        "key_statements": ["statement1", "statement2"],
-        "strategic_focus": ["focus1", "focus2"]
-    }},
-    "risks_and_opportunities": [
-        {{
-            "type": "risk" or "opportunity",
-            "description": "Clear description",
-            "potential_impact": "high/medium/low"
-        }}
-    ],
-    "quarterly_forecast": "Detailed forecast for next quarter",
-    "confidence_level": "high/medium/low",
-    "data_sources_used": {json.dumps(tools_used)}
-}}
-
-Return ONLY the JSON object, no other text."""
+            tools_used_json = orjson.dumps(tools_used).decode()
+            
+            synthesis_prompt = SYNTHESIS_PROMPT_TEMPLATE.substitute(
+                task=task,
+                combined_data=combined_data,
+                tools_used_json=tools_used_json
+            )
 
             # Use LLM to synthesize
-            response = self.llm.invoke(synthesis_prompt)
-            
-            # Extract content based on provider
-            if get_provider_name() == "openai":
-                output_text = response.content
-            else:
-                # Ollama returns different format
-                output_text = response.content if hasattr(response, 'content') else str(response)
+            output_text = self._synthesize(synthesis_prompt)
             
             logger.info("✅ LLM synthesis complete")
             
@@ -153,7 +233,63 @@ Return ONLY the JSON object, no other text."""
             logger.error(f"Error generating forecast: {e}")
             raise
     
-    def _extract_transcript_query(self, task: str) -> str:
+    def _synthesize(self, prompt: str) -> str:
+        """
+        Run the synthesis prompt, streaming tokens when the provider supports it
+        
+        Streaming stops as soon as the first top-level JSON object is closed,
+        so trailing commentary from the model is never waited on.
+        
+        Args:
+            prompt: Synthesis prompt
+        
+        Returns:
+            Raw text output from LLM
+        """
+        try:
+            return stream_json_object(self.llm, prompt)
+        except PartialStreamError:
+            # Don't pay for a second full generation after a late failure
+            raise
+        except Exception as e:
+            logger.warning(f"Streaming unavailable ({e}), falling back to invoke")
+        
+        response = self.llm.invoke(prompt)
+        
+        # Extract content based on provider
+        if get_provider_name() == "openai":
+            return response.content
+        # Ollama returns different format
+        return response.content if hasattr(response, 'content') else str(response)
+    
+    def _cached_market_data(self, symbol: str) -> str:
+        """
+        Fetch market data, reusing recent quotes for the same symbol
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            JSON string with market data
+        """
+        with _market_data_lock:
+            cached = _market_data_cache.get(symbol)
+        if cached is not None:
+            logger.info(f"Using cached market data for {symbol}")
+            return cached
+        
+        output = fetch_market_data(symbol)
+        
+        # Don't cache failed fetches
+        if "error" not in orjson.loads(output):
+            with _market_data_lock:
+                _market_data_cache[symbol] = output
+        
+        return output
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_transcript_query(task: str) -> str:
         """
         Extract a relevant query for transcript analysis
         
@@ -185,63 +321,39 @@ Return ONLY the JSON object, no other text."""
         Returns:
             Parsed JSON dictionary
         """
-        try:
-            # Try direct JSON parse
-            return json.loads(text.strip())
-        except json.JSONDecodeError:
-            # Try to find JSON block in text
-            # Look for JSON between ```json and ``` or just { and }
-            json_patterns = [
-                r'```json\s*(\{.*?\})\s*```',
-                r'```\s*(\{.*?\})\s*```',
-                r'(\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})'
-            ]
-            
-            for pattern in json_patterns:
-                match = re.search(pattern, text, re.DOTALL)
-                if match:
-                    try:
-                        return json.loads(match.group(1))
-                    except:
-                        continue
-            
-            # Last resort: try to extract just the outer braces
-            start = text.find('{')
-            end = text.rfind('}')
-            if start != -1 and end != -1:
-                try:
-                    return json.loads(text[start:end+1])
-                except:
-                    pass
-            
-            # Fallback: create minimal valid structure
-            logger.warning("Could not parse JSON from output, using fallback")
-            return {
-                "summary": "Analysis completed. Check logs for full details.",
-                "financial_trends": [
-                    {
-                        "metric": "General Analysis",
-                        "trend": "stable",
-                        "percentage_change": 0.0,
-                        "analysis": text[:200] if len(text) > 200 else text
-                    }
-                ],
-                "management_outlook": {
-                    "sentiment": "neutral",
-                    "key_statements": ["See raw output for details"],
-                    "strategic_focus": ["Multiple areas"]
-                },
-                "risks_and_opportunities": [
-                    {
-                        "type": "opportunity",
-                        "description": "Analysis in progress",
-                        "potential_impact": "medium"
-                    }
-                ],
-                "quarterly_forecast": text[:500] if len(text) > 500 else text,
-                "confidence_level": "medium",
-                "data_sources_used": ["analysis_tools"]
-            }
+        parsed = _parse_json_text(text)
+        if parsed is not None:
+            # Copy so callers never mutate the cached result
+            return copy.deepcopy(parsed)
+        
+        # Fallback: create minimal valid structure
+        logger.warning("Could not parse JSON from output, using fallback")
+        return {
+            "summary": "Analysis completed. Check logs for full details.",
+            "financial_trends": [
+                {
+                    "metric": "General Analysis",
+                    "trend": "stable",
+                    "percentage_change": 0.0,
+                    "analysis": text[:200] if len(text) > 200 else text
+                }
+            ],
+            "management_outlook": {
+                "sentiment": "neutral",
+                "key_statements": ["See raw output for details"],
+                "strategic_focus": ["Multiple areas"]
+            },
+            "risks_and_opportunities": [
+                {
+                    "type": "opportunity",
+                    "description": "Analysis in progress",
+                    "potential_impact": "medium"
+                }
+            ],
+            "quarterly_forecast": text[:500] if len(text) > 500 else text,
+            "confidence_level": "medium",
+            "data_sources_used": ["analysis_tools"]
+        }
 
 
 # """
@@ -2,6 +2,7 @@
 Agent Prompts and Templates
 Master prompt for orchestrating the forecasting agent
 """
+from string import Template
 
 # Master agent system prompt
 AGENT_SYSTEM_PROMPT = """You are a Financial Forecasting AI Agent specializing in analyzing Tata Consultancy Services (TCS).
@@ -54,4 +55,43 @@ Your final answer MUST be a valid JSON object with this exact structure:
 
 IMPORTANT: Return ONLY the JSON object in your final answer, no other text.
 
-Be analytical, evidence-based, and clearly cite which tools provided which insights."""
\ No newline at end of file
+Be analytical, evidence-based, and clearly cite which tools provided which insights."""
+
+
+# Synthesis prompt, precompiled once; only the $-placeholders vary per request
+SYNTHESIS_PROMPT_TEMPLATE = Template("""Based on the following data about TCS, generate a comprehensive forecast.
+
+Task: ${task}
+
+Available Data:
+${combined_data}
+
+Generate a forecast as a JSON object with this exact structure:
+{
+    "summary": "2-3 sentence executive summary",
+    "financial_trends": [
+        {
+            "metric": "Revenue/Profit/Margin",
+            "trend": "increasing/decreasing/stable",
+            "percentage_change": 5.2,
+            "analysis": "Brief explanation"
+        }
+    ],
+    "management_outlook": {
+        "sentiment": "positive/negative/neutral",
+        "key_statements": ["statement1", "statement2"],
+        "strategic_focus": ["focus1", "focus2"]
+    },
+    "risks_and_opportunities": [
+        {
+            "type": "risk" or "opportunity",
+            "description": "Clear description",
+            "potential_impact": "high/medium/low"
+        }
+    ],
+    "quarterly_forecast": "Detailed forecast for next quarter",
+    "confidence_level": "high/medium/low",
+    "data_sources_used": ${tools_used_json}
+}
+
+Return ONLY the JSON object, no other text.""")
\ No newline at end of file
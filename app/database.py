@@ -6,9 +6,19 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from app.config import settings
+import os
 
 # Create database engine
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+# Pool sized to the host so concurrent requests don't stall on checkout;
+# LIFO reuse keeps the most recently used connection warm
+engine = create_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    pool_size=min(32, (os.cpu_count() or 1) * 4),
+    max_overflow=16,
+    pool_recycle=1800,
+    pool_use_lifo=True
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
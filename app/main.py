@@ -3,15 +3,22 @@ FastAPI Application - Main Entry Point
 """
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from cachetools import TTLCache
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, Optional
+import threading
 import time
 import logging
+import uuid
 
 from app.config import settings
-from app.database import get_db, init_db, ForecastLog
-from app.models import ForecastRequest, ForecastResponse, ForecastOutput
+from app.database import get_db, init_db, ForecastLog, SessionLocal
+from app.models import ForecastRequest, ForecastResponse, ForecastOutput, ForecastJob
 from agent.orchestrator import ForecastOrchestrator
+from tools.qualitative_analysis import warmup_transcripts
 from utils.llm_provider import get_provider_name
 
 # Configure logging
@@ -25,9 +32,23 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="TCS Financial Forecasting Agent",
     description="AI-powered business outlook forecasting for Tata Consultancy Services",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Shared orchestrator (created once at startup, reused across requests)
+ORCHESTRATOR: Optional[ForecastOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+# Forecasts run on worker threads. Unfinished jobs are tracked until they
+# complete (never evicted) and capped so the executor queue stays bounded;
+# finished jobs are kept for an hour for polling
+FORECAST_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="forecast")
+MAX_ACTIVE_FORECASTS = 16
+active_forecast_jobs: Dict[str, Future] = {}
+finished_forecast_jobs: TTLCache = TTLCache(maxsize=1000, ttl=3600)
+forecast_jobs_lock = threading.Lock()
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,49 +62,74 @@ app.add_middleware(
 @app.on_event("startup")
 def startup_event():
     """Initialize database and agent on startup"""
+    global ORCHESTRATOR
     logger.info("Initializing application...")
     init_db()
+    with _orchestrator_lock:
+        if ORCHESTRATOR is None:
+            ORCHESTRATOR = ForecastOrchestrator()
+    
+    # Embed transcripts now so the first forecast doesn't pay for it
+    if warmup_transcripts(ORCHESTRATOR.transcripts_dir):
+        logger.info("Transcript vectorstore ready")
+    else:
+        logger.warning("Transcript vectorstore not available")
+    
     logger.info(f"Using LLM provider: {get_provider_name()}")
     logger.info("Application ready")
 
 
-@app.get("/")
-def root():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "TCS Financial Forecasting Agent",
-        "llm_provider": get_provider_name()
-    }
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop accepting forecast jobs on shutdown"""
+    FORECAST_EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
 
-@app.get("/health")
-def health_check():
-    """Detailed health check"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "llm_provider": get_provider_name(),
-        "database": "connected"
-    }
+def get_orchestrator() -> ForecastOrchestrator:
+    """Dependency for getting the shared orchestrator"""
+    global ORCHESTRATOR
+    if ORCHESTRATOR is None:
+        with _orchestrator_lock:
+            # Another request may have created it while we waited
+            if ORCHESTRATOR is None:
+                ORCHESTRATOR = ForecastOrchestrator()
+    return ORCHESTRATOR
 
 
-@app.post("/forecast", response_model=ForecastResponse)
-def generate_forecast(
-    request: ForecastRequest,
-    db: Session = Depends(get_db)
-):
+def save_forecast_log(**fields) -> Optional[int]:
     """
-    Generate a financial forecast for TCS
+    Persist a forecast log entry in its own session
     
-    This endpoint orchestrates the AI agent to:
-    1. Extract financial metrics from quarterly reports
-    2. Analyze earnings call transcripts
-    3. Generate a structured forecast
+    Runs on the forecast worker thread, so it cannot use a request-scoped
+    session.
     
     Args:
-        request: Forecast request with task description
-        db: Database session
+        fields: ForecastLog column values
+    
+    Returns:
+        ID of the new log entry, or None if it could not be saved
+    """
+    db = SessionLocal()
+    try:
+        log_entry = ForecastLog(**fields)
+        db.add(log_entry)
+        db.commit()
+        return log_entry.id
+    except Exception as e:
+        logger.error(f"Error saving forecast log: {e}")
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+
+def run_forecast_job(task: str, orchestrator: ForecastOrchestrator) -> ForecastResponse:
+    """
+    Generate a forecast and log it to the database
+    
+    Args:
+        task: The forecasting task
+        orchestrator: Shared forecast orchestrator
     
     Returns:
         Structured forecast with execution metadata
@@ -91,13 +137,8 @@ def generate_forecast(
     start_time = time.time()
     
     try:
-        logger.info(f"Received forecast request: {request.task[:100]}...")
-        
-        # Initialize orchestrator
-        orchestrator = ForecastOrchestrator()
-        
         # Generate forecast
-        result = orchestrator.generate_forecast(request.task)
+        result = orchestrator.generate_forecast(task)
         
         execution_time = time.time() - start_time
         
@@ -109,28 +150,24 @@ def generate_forecast(
         forecast_output = ForecastOutput(**forecast_data)
         
         # Log to database
-        log_entry = ForecastLog(
-            task_description=request.task,
+        log_id = save_forecast_log(
+            task_description=task,
             tools_used=tools_used,
             execution_time_seconds=round(execution_time, 2),
             forecast_output=forecast_data,
             llm_provider=get_provider_name(),
             status="success"
         )
-        db.add(log_entry)
-        db.commit()
-        db.refresh(log_entry)
         
         logger.info(f"Forecast generated successfully in {execution_time:.2f}s")
         
-        # Return response
         return ForecastResponse(
             status="success",
             timestamp=datetime.utcnow(),
             execution_time_seconds=round(execution_time, 2),
             tools_used=tools_used,
             forecast=forecast_output,
-            log_id=log_entry.id
+            log_id=log_id
         )
         
     except Exception as e:
@@ -138,22 +175,118 @@ def generate_forecast(
         logger.error(f"Error generating forecast: {e}", exc_info=True)
         
         # Log error to database
-        try:
-            error_log = ForecastLog(
-                task_description=request.task,
-                tools_used=[],
-                execution_time_seconds=round(execution_time, 2),
-                forecast_output={"error": str(e)},
-                llm_provider=get_provider_name(),
-                status="error",
-                error_message=str(e)
+        save_forecast_log(
+            task_description=task,
+            tools_used=[],
+            execution_time_seconds=round(execution_time, 2),
+            forecast_output={"error": str(e)},
+            llm_provider=get_provider_name(),
+            status="error",
+            error_message=str(e)
+        )
+        raise
+
+
+def _finish_forecast_job(job_id: str):
+    """Move a completed job from the active set to the finished cache"""
+    with forecast_jobs_lock:
+        future = active_forecast_jobs.pop(job_id, None)
+        if future is not None:
+            finished_forecast_jobs[job_id] = future
+
+
+@app.get("/")
+def root():
+    """Health check endpoint"""
+    return {
+        "status": "healthy",
+        "service": "TCS Financial Forecasting Agent",
+        "llm_provider": get_provider_name()
+    }
+
+
+@app.get("/health")
+def health_check():
+    """Detailed health check"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "llm_provider": get_provider_name(),
+        "database": "connected"
+    }
+
+
+@app.post("/forecast", response_model=ForecastJob, status_code=202)
+def generate_forecast(
+    request: ForecastRequest,
+    orchestrator: ForecastOrchestrator = Depends(get_orchestrator)
+):
+    """
+    Start generating a financial forecast for TCS
+    
+    This endpoint queues the AI agent to:
+    1. Extract financial metrics from quarterly reports
+    2. Analyze earnings call transcripts
+    3. Generate a structured forecast
+    
+    Poll GET /forecast/{job_id} for the result.
+    
+    Args:
+        request: Forecast request with task description
+        orchestrator: Shared forecast orchestrator
+    
+    Returns:
+        Job ID and initial status
+    """
+    logger.info(f"Received forecast request: {request.task[:100]}...")
+    
+    job_id = str(uuid.uuid4())
+    with forecast_jobs_lock:
+        if len(active_forecast_jobs) >= MAX_ACTIVE_FORECASTS:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many forecasts in progress, retry later",
+                headers={"Retry-After": "30"}
             )
-            db.add(error_log)
-            db.commit()
-        except:
-            pass
-        
-        raise HTTPException(status_code=500, detail=str(e))
+        future = FORECAST_EXECUTOR.submit(run_forecast_job, request.task, orchestrator)
+        active_forecast_jobs[job_id] = future
+    
+    # Registered outside the lock: it runs inline if the job already finished
+    future.add_done_callback(lambda _: _finish_forecast_job(job_id))
+    
+    return ForecastJob(job_id=job_id, status="pending")
+
+
+@app.get("/forecast/{job_id}", response_model=ForecastJob)
+def get_forecast(job_id: str):
+    """
+    Get the status, and once finished the result, of a forecast job
+    
+    Args:
+        job_id: ID returned by POST /forecast
+    
+    Returns:
+        Job status with the forecast or error once complete
+    """
+    with forecast_jobs_lock:
+        future = active_forecast_jobs.get(job_id) or finished_forecast_jobs.get(job_id)
+    
+    if future is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    
+    if not future.done():
+        status = "running" if future.running() else "pending"
+        return ForecastJob(job_id=job_id, status=status)
+    
+    # exception() raises CancelledError for jobs cancelled at shutdown
+    if future.cancelled():
+        return ForecastJob(job_id=job_id, status="error", error="cancelled")
+    
+    error = future.exception()
+    if error is not None:
+        return ForecastJob(job_id=job_id, status="error", error=str(error))
+    
+    return ForecastJob(job_id=job_id, status="success", result=future.result())
 
 
 @app.get("/logs")
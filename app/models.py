@@ -55,4 +55,12 @@ class ForecastResponse(BaseModel):
     execution_time_seconds: float
     tools_used: List[str]
     forecast: ForecastOutput
-    log_id: int
\ No newline at end of file
+    log_id: Optional[int] = None  # None if the log could not be saved
+
+
+class ForecastJob(BaseModel):
+    """Forecast job status, returned by POST /forecast and GET /forecast/{job_id}"""
+    job_id: str
+    status: str  # "pending", "running", "success", "error"
+    result: Optional[ForecastResponse] = None
+    error: Optional[str] = None
\ No newline at end of file
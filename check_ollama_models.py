@@ -2,10 +2,19 @@
 """
 Script to check available Ollama models and pull missing ones
 """
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app.config import settings
 
+# Shared session so /api/tags and /api/pull reuse one connection, with
+# exponential backoff on transient server errors
+_retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_retry))
+_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_retry))
+
 def check_available_models():
     """Check what models are available on the Ollama server"""
     base_url = settings.ollama_base_url.rstrip('/')
@@ -15,7 +24,7 @@ def check_available_models():
     print(f"Looking for model: {settings.ollama_model}\n")
     
     try:
-        response = requests.get(api_url, timeout=10)
+        response = _session.get(api_url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             models = data.get('models', [])
@@ -62,7 +71,7 @@ def pull_model():
     print(f"From server: {base_url}\n")
     
     try:
-        response = requests.post(
+        response = _session.post(
             api_url,
             json={"name": settings.ollama_model},
             stream=True,
@@ -71,14 +80,18 @@ def pull_model():
         
         if response.status_code == 200:
             print("Pulling model (this may take a while)...")
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        data = json.loads(line)
-                        if 'status' in data:
-                            print(f"  {data['status']}")
-                    except:
-                        pass
+            # ndjson is sent without a charset, so decode_unicode needs one set
+            response.encoding = "utf-8"
+            for line in response.iter_lines(chunk_size=65536, decode_unicode=True):
+                # Skip keep-alive blanks and anything that isn't a status frame
+                if not line or line[0] != '{':
+                    continue
+                try:
+                    data = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                if 'status' in data:
+                    print(f"  {data['status']}")
             print("\n✅ Model pull completed!")
             return True
         else:
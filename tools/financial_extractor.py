@@ -3,17 +3,153 @@ Financial Data Extractor Tool
 Extracts key financial metrics from quarterly reports using LLM
 """
 from langchain.tools import Tool
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from utils.llm_provider import get_llm
+from langchain.schema import Document
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import JsonOutputParser
+from cachetools import LRUCache
+from utils.llm_provider import (
+    get_llm, get_embeddings, get_provider_name, get_model_name, get_context_window
+)
 from utils.document_loader import DocumentLoader
-from typing import Dict, Any
+from utils.json_stream import stream_json_object
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List
+import asyncio
+import copy
 import json
 import logging
-import re
+import numpy as np
+import os
+import threading
+import tiktoken
 
 logger = logging.getLogger(__name__)
 
+# The orchestrator already runs tools concurrently, so keep this pool small
+MAX_LOAD_WORKERS = max(1, (os.cpu_count() or 1) // 3)
+
+# Parses the LLM's JSON output (tolerates markdown fences around it)
+_json_parser = JsonOutputParser()
+
+# Maximum extraction requests in flight to the LLM server at once
+MAX_CONCURRENT_EXTRACTIONS = 8
+
+# Report text is chosen by similarity to the metrics being extracted, up to
+# the model's context window less room for the prompt and the JSON answer
+# (capped so large-context models still get a small, dense prompt)
+EXTRACTION_QUERY = "quarterly revenue net profit operating margin segment highlights"
+RESERVED_TOKENS = 1024
+MAX_REPORT_TOKENS = 6000
+CHARS_PER_TOKEN = 4  # rough estimate when the tokenizer is unavailable
+
+# Only this many chunks, shortlisted by keyword hits, are embedded per report
+# (each embedded chunk is an API call's worth of tokens with OpenAI)
+MAX_EMBEDDED_CHUNKS = 32
+_EXTRACTION_TERMS = tuple(EXTRACTION_QUERY.split())
+
+# Per-report extraction results keyed on report content and model, so
+# unchanged reports are never sent to the LLM twice
+_extraction_cache = LRUCache(maxsize=32)
+_extraction_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _token_encoder() -> tiktoken.Encoding:
+    """Get the tokenizer used to size report text for the current model"""
+    try:
+        return tiktoken.encoding_for_model(get_model_name())
+    except KeyError:
+        # Not an OpenAI model (e.g. Ollama); close enough for budgeting
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=1)
+def _extraction_query_vector() -> np.ndarray:
+    """Embed and L2-normalize the extraction query"""
+    vector = np.asarray(get_embeddings().embed_query(EXTRACTION_QUERY), dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _lexical_candidates(texts: List[str]) -> List[int]:
+    """
+    Shortlist chunks by keyword hits before paying to embed them
+    
+    Args:
+        texts: Report chunk texts
+    
+    Returns:
+        Indices of at most MAX_EMBEDDED_CHUNKS chunks with the most hits
+    """
+    if len(texts) <= MAX_EMBEDDED_CHUNKS:
+        return list(range(len(texts)))
+    hits = [sum(text.lower().count(term) for term in _EXTRACTION_TERMS) for text in texts]
+    # sorted() is stable, so ties keep document order
+    return sorted(range(len(texts)), key=lambda index: -hits[index])[:MAX_EMBEDDED_CHUNKS]
+
+
+def _select_report_text(documents: List[Document]) -> str:
+    """
+    Pick the report chunks most relevant to the extracted metrics
+    
+    Args:
+        documents: Report chunks in document order
+    
+    Returns:
+        Selected chunks joined in document order, within the token budget
+        (empty if not even one chunk fits)
+    """
+    texts = [doc.page_content for doc in documents]
+    budget = min(MAX_REPORT_TOKENS, get_context_window() - RESERVED_TOKENS)
+    
+    try:
+        token_counts = [
+            len(tokens) for tokens in
+            _token_encoder().encode_batch(texts, disallowed_special=())
+        ]
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, estimating token counts: {e}")
+        token_counts = [len(text) // CHARS_PER_TOKEN for text in texts]
+    
+    if sum(token_counts) <= budget:
+        return "\n\n".join(texts)
+    
+    selected, used = [], 0
+    try:
+        # Rank shortlisted chunks by cosine similarity to the extraction query
+        candidates = _lexical_candidates(texts)
+        vectors = np.asarray(
+            get_embeddings().embed_documents([texts[index] for index in candidates]),
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1.0
+        scores = (vectors @ _extraction_query_vector()) / norms
+        
+        for rank in np.argsort(-scores):
+            index = candidates[rank]
+            if used + token_counts[index] <= budget:
+                selected.append(index)
+                used += token_counts[index]
+    except Exception as e:
+        logger.warning(f"Relevance-based chunk selection failed, using leading chunks: {e}")
+        # Leading chunks (usually the financial summary) while they fit
+        for index, count in enumerate(token_counts):
+            if used + count > budget:
+                break
+            selected.append(index)
+            used += count
+    
+    if not selected:
+        logger.warning(f"No report chunk fits the {budget}-token budget")
+        return ""
+    
+    logger.info(f"Selected {len(selected)} of {len(texts)} chunks ({used} tokens)")
+    # Keep reading order so the LLM sees coherent text
+    return "\n\n".join(texts[index] for index in sorted(selected))
+
 
 # Extraction prompt template
 EXTRACTION_PROMPT = """You are a financial analyst expert. Extract key financial metrics from the provided quarterly report text.
@@ -38,60 +174,117 @@ If any value is not found, use null. Be precise and extract only factual numbers
 JSON Output:"""
 
 
-def extract_financial_data(file_path: str) -> str:
+def _parse_extraction(result: str) -> Dict[str, Any]:
     """
-    Extract financial data from report
+    Parse LLM extraction output into a metrics dictionary
     
     Args:
-        file_path: Path to financial report PDF or directory
+        result: Raw text output from LLM
     
     Returns:
-        JSON string with extracted financial metrics
+        Extracted metrics, or a dictionary with an "error" key
     """
     try:
-        # Initialize LLM and document loader
-        llm = get_llm(temperature=0.0)  # Deterministic for extraction
-        document_loader = DocumentLoader(chunk_size=2000)
-        
-        # Load document(s)
-        from pathlib import Path
-        path = Path(file_path)
-        
-        if path.is_dir():
-            documents = document_loader.load_directory(file_path, ".pdf")
-        elif path.suffix == ".pdf":
-            documents = document_loader.load_pdf(file_path)
-        else:
-            documents = document_loader.load_text(file_path)
-        
-        if not documents:
-            return json.dumps({"error": "No documents loaded"})
-        
-        # Combine relevant chunks (first 5 usually contain financial summary)
-        combined_text = "\n\n".join([doc.page_content for doc in documents[:5]])
+        parsed_result = _json_parser.parse(result)
+    except OutputParserException:
+        return {"error": "Failed to parse LLM output", "raw": result}
+    
+    if not isinstance(parsed_result, dict):
+        return {"error": "LLM output is not a JSON object", "raw": result}
+    
+    logger.info(f"Successfully extracted metrics: {parsed_result.get('quarter', 'Unknown')}")
+    return parsed_result
+
+
+async def _aextract(file_path: str) -> Any:
+    """
+    Extract metrics from each report concurrently
+    
+    Args:
+        file_path: Path to financial report PDF or directory
+    
+    Returns:
+        Metrics dictionary for a single report, or a list of them for a directory
+    """
+    path = Path(file_path)
+    report_files = sorted(path.glob("*.pdf")) if path.is_dir() else [path]
+    
+    if not report_files:
+        return {"error": "No documents loaded"}
+    
+    # Initialize LLM and document loader
+    llm = get_llm(temperature=0.0, json_mode=True)  # Deterministic, JSON-only output
+    document_loader = DocumentLoader(chunk_size=2000)
+    
+    prompt = PromptTemplate(
+        input_variables=["report_text"],
+        template=EXTRACTION_PROMPT
+    )
+    chain = prompt | llm
+    
+    load_semaphore = asyncio.Semaphore(MAX_LOAD_WORKERS)
+    llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+    
+    async def extract_report(report: Path) -> Dict[str, Any]:
+        load = document_loader.load_pdf if report.suffix == ".pdf" else document_loader.load_text
         
-        # Create extraction chain
-        prompt = PromptTemplate(
-            input_variables=["report_text"],
-            template=EXTRACTION_PROMPT
-        )
-        extraction_chain = LLMChain(llm=llm, prompt=prompt)
+        # Hash, load and pick relevant chunks off the event loop
+        async with load_semaphore:
+            # Hashed once here; the loader reuses it for its chunk cache
+            content_hash = await asyncio.to_thread(DocumentLoader.content_hash, str(report))
+            
+            # Reuse a previous extraction of identical content
+            cache_key = (content_hash, get_provider_name(), get_model_name())
+            with _extraction_cache_lock:
+                cached = _extraction_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached extraction for {report.name}")
+                return copy.deepcopy(cached)
+            
+            documents = await asyncio.to_thread(load, str(report), content_hash)
+            if not documents:
+                return {"source": report.name, "error": "No documents loaded"}
+            combined_text = await asyncio.to_thread(_select_report_text, documents)
+            if not combined_text:
+                return {"source": report.name, "error": "Report text does not fit the model context"}
         
-        # Extract metrics using LLM
-        result = extraction_chain.run(report_text=combined_text)
+        # Extract metrics using LLM, stopping generation once the JSON closes.
+        # Streams through the sync client in a worker thread: the cached LLM's
+        # async client is bound to the event loop that first used it, and each
+        # extract_financial_data call runs on a fresh loop
+        async with llm_semaphore:
+            result = await asyncio.to_thread(
+                stream_json_object, chain, {"report_text": combined_text}
+            )
         
-        # Parse and validate JSON
-        try:
-            parsed_result = json.loads(result.strip())
-            logger.info(f"Successfully extracted metrics: {parsed_result.get('quarter', 'Unknown')}")
-            return json.dumps(parsed_result, indent=2)
-        except json.JSONDecodeError:
-            # LLM might include extra text, try to extract JSON
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                return json_match.group()
-            return json.dumps({"error": "Failed to parse LLM output", "raw": result})
-            
+        metrics = {"source": report.name, **_parse_extraction(result)}
+        if "error" not in metrics:
+            with _extraction_cache_lock:
+                _extraction_cache[cache_key] = copy.deepcopy(metrics)
+        return metrics
+    
+    results = await asyncio.gather(*[extract_report(report) for report in report_files])
+    
+    if not path.is_dir():
+        return results[0]
+    if all("error" in result for result in results):
+        return {"error": "No financial data extracted", "reports": results}
+    return results
+
+
+def extract_financial_data(file_path: str) -> str:
+    """
+    Extract financial data from report
+    
+    Args:
+        file_path: Path to financial report PDF or directory
+    
+    Returns:
+        JSON string with extracted financial metrics (a list, one entry per
+        report, when given a directory)
+    """
+    try:
+        return json.dumps(asyncio.run(_aextract(file_path)), indent=2)
     except Exception as e:
         logger.error(f"Error in financial extraction: {e}")
         return json.dumps({"error": str(e)})
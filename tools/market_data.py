@@ -3,12 +3,20 @@ Market Data Tool (Optional)
 Fetches live market data for additional context
 """
 from langchain.tools import Tool
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import requests
-import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared session so repeated fetches reuse the keep-alive connection to Yahoo,
+# with exponential backoff on rate limits and transient server errors
+_retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=_retry))
+
 
 def fetch_market_data(symbol: str = "TCS.NS") -> str:
     """
@@ -28,10 +36,10 @@ def fetch_market_data(symbol: str = "TCS.NS") -> str:
             "range": "1mo"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Extract relevant information
             result = data.get("chart", {}).get("result", [{}])[0]
@@ -58,20 +66,20 @@ def fetch_market_data(symbol: str = "TCS.NS") -> str:
                 market_data["change_percent"] = round(change_percent, 2)
             
             logger.info(f"Fetched market data for {symbol}")
-            return json.dumps(market_data, indent=2)
+            return orjson.dumps(market_data, option=orjson.OPT_INDENT_2).decode()
         else:
-            return json.dumps({
+            return orjson.dumps({
                 "error": f"Failed to fetch data: {response.status_code}",
                 "symbol": symbol
-            })
+            }).decode()
             
     except Exception as e:
         logger.error(f"Error fetching market data: {e}")
-        return json.dumps({
+        return orjson.dumps({
             "error": str(e),
             "symbol": symbol,
             "note": "Market data unavailable"
-        })
+        }).decode()
 
 
 # Create the tool
@@ -4,18 +4,60 @@ RAG-based tool for analyzing earnings call transcripts
 """
 from langchain.tools import Tool
 from langchain.chains import RetrievalQA
-from langchain_community.vectorstores import Chroma
-from utils.llm_provider import get_llm, get_embeddings
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from utils.llm_provider import get_llm, get_embeddings, get_provider_name, get_embedding_model_name
 from utils.document_loader import DocumentLoader
+from utils.cache import SemanticCache
 from pathlib import Path
+import hashlib
 import logging
 import json
+import threading
 
 logger = logging.getLogger(__name__)
 
 # Global vectorstore (initialized once)
 _vectorstore = None
 _initialized = False
+_init_lock = threading.Lock()
+
+# On-disk vectorstore, reused across restarts while transcripts are unchanged.
+# A flat inner-product FAISS index over L2-normalized vectors gives exact
+# cosine top-k in a single matrix-vector product, which for a corpus this
+# size is far cheaper per query than a database-backed store
+FAISS_INDEX_DIR = Path("data/faiss_tcs")
+FAISS_FINGERPRINT_FILE = Path("data/faiss_tcs.fingerprint.json")
+
+# Transcript splitter settings (part of the index fingerprint)
+TRANSCRIPT_CHUNK_SIZE = 1000
+TRANSCRIPT_CHUNK_OVERLAP = 150
+
+# Answers for identical or near-identical queries (the LLM and temperature
+# are fixed for the process, so the query alone identifies a response)
+_analysis_cache = SemanticCache(threshold=0.95)
+
+
+def _transcripts_fingerprint(transcripts_dir: str) -> str:
+    """
+    Fingerprint the transcripts directory, embedding model and splitter settings
+    
+    Args:
+        transcripts_dir: Directory containing earnings transcripts
+    
+    Returns:
+        Hex digest that changes whenever the persisted index would be stale
+    """
+    files = sorted(
+        (p.name, p.stat().st_size, p.stat().st_mtime_ns)
+        for p in Path(transcripts_dir).iterdir() if p.is_file()
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((
+        get_provider_name(), get_embedding_model_name(),
+        TRANSCRIPT_CHUNK_SIZE, TRANSCRIPT_CHUNK_OVERLAP, files
+    )).encode())
+    return digest.hexdigest()
 
 
 def initialize_vectorstore(transcripts_dir: str = "data/transcripts"):
@@ -25,40 +67,85 @@ def initialize_vectorstore(transcripts_dir: str = "data/transcripts"):
     if _initialized:
         return _vectorstore
     
-    try:
-        # Check if directory exists
-        if not Path(transcripts_dir).exists():
-            logger.warning(f"Transcripts directory not found: {transcripts_dir}")
-            return None
+    with _init_lock:
+        # Another thread may have finished the build while we waited
+        if _initialized:
+            return _vectorstore
         
-        # Load all transcripts
-        document_loader = DocumentLoader(chunk_size=1000, chunk_overlap=150)
-        documents = document_loader.load_directory(transcripts_dir, ".txt")
-        
-        if not documents:
-            # Try PDF as fallback
-            documents = document_loader.load_directory(transcripts_dir, ".pdf")
-        
-        if not documents:
-            logger.warning("No transcripts found")
+        try:
+            # Check if directory exists
+            if not Path(transcripts_dir).exists():
+                logger.warning(f"Transcripts directory not found: {transcripts_dir}")
+                return None
+            
+            embeddings = get_embeddings()
+            fingerprint = _transcripts_fingerprint(transcripts_dir)
+            
+            # Reuse the persisted index if transcripts haven't changed
+            if FAISS_FINGERPRINT_FILE.exists() and FAISS_INDEX_DIR.exists():
+                stored = json.loads(FAISS_FINGERPRINT_FILE.read_text())
+                if stored.get("fingerprint") == fingerprint:
+                    # The pickled docstore was written by this app's own
+                    # save_local into its data directory, not fetched from
+                    # an untrusted source
+                    _vectorstore = FAISS.load_local(
+                        str(FAISS_INDEX_DIR),
+                        embeddings,
+                        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+                        allow_dangerous_deserialization=True
+                    )
+                    _initialized = True
+                    logger.info(f"Loaded persisted vectorstore from {FAISS_INDEX_DIR}")
+                    return _vectorstore
+            
+            # Load all transcripts
+            document_loader = DocumentLoader(
+                chunk_size=TRANSCRIPT_CHUNK_SIZE,
+                chunk_overlap=TRANSCRIPT_CHUNK_OVERLAP
+            )
+            documents = document_loader.load_directory(transcripts_dir, ".txt")
+            
+            if not documents:
+                # Try PDF as fallback
+                documents = document_loader.load_directory(transcripts_dir, ".pdf")
+            
+            if not documents:
+                logger.warning("No transcripts found")
+                return None
+            
+            # Invalidate the stale index before it is overwritten
+            FAISS_FINGERPRINT_FILE.unlink(missing_ok=True)
+            
+            # Create vector store (both embedding backends return unit
+            # vectors, so inner product is cosine similarity)
+            _vectorstore = FAISS.from_documents(
+                documents,
+                embeddings,
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+            _vectorstore.save_local(str(FAISS_INDEX_DIR))
+            FAISS_FINGERPRINT_FILE.write_text(json.dumps({"fingerprint": fingerprint}))
+            _initialized = True
+            logger.info(f"Initialized vectorstore with {len(documents)} chunks")
+            return _vectorstore
+            
+        except Exception as e:
+            logger.error(f"Error initializing vectorstore: {e}")
             return None
-        
-        # Get embeddings
-        embeddings = get_embeddings()
-        
-        # Create vector store
-        _vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=embeddings,
-            collection_name="tcs_transcripts"
-        )
-        _initialized = True
-        logger.info(f"Initialized vectorstore with {len(documents)} chunks")
-        return _vectorstore
-        
-    except Exception as e:
-        logger.error(f"Error initializing vectorstore: {e}")
-        return None
+
+
+def warmup_transcripts(transcripts_dir: str = "data/transcripts") -> bool:
+    """
+    Build the transcript vectorstore ahead of the first query
+    
+    Args:
+        transcripts_dir: Directory containing earnings transcripts
+    
+    Returns:
+        True if the vectorstore is ready
+    """
+    vectorstore = initialize_vectorstore(transcripts_dir)
+    return vectorstore is not None
 
 
 def analyze_transcripts(query: str) -> str:
@@ -72,6 +159,11 @@ def analyze_transcripts(query: str) -> str:
         JSON string with analysis results
     """
     try:
+        # Skip the LLM round-trip for queries answered before
+        cached, query_vector = _analysis_cache.get(query)
+        if cached is not None:
+            return cached
+        
         # Initialize vectorstore if needed
         vectorstore = initialize_vectorstore()
         
@@ -110,14 +202,17 @@ Format as JSON."""
         # Try to parse as JSON, or wrap in structure
         try:
             parsed = json.loads(result)
-            return json.dumps(parsed, indent=2)
+            output = json.dumps(parsed, indent=2)
         except:
             # Create structured response
-            return json.dumps({
+            output = json.dumps({
                 "query": query,
                 "analysis": result,
                 "source": "earnings_transcripts"
             }, indent=2)
+        
+        _analysis_cache.put(query, output, query_vector)
+        return output
             
     except Exception as e:
         logger.error(f"Error in qualitative analysis: {e}")
@@ -0,0 +1,120 @@
+"""
+Response Cache Utilities
+Two-tier (exact + semantic) cache for LLM-backed tool responses
+"""
+from collections import OrderedDict
+from typing import Optional, Tuple
+from utils.llm_provider import get_embeddings
+import logging
+import re
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def _numbers(query: str) -> tuple:
+    """Numbers in a query (quarters, years), which must match for a semantic hit"""
+    return tuple(_NUMBER_RE.findall(query))
+
+
+class SemanticCache:
+    """
+    Cache that returns a stored answer for an identical query, or for a
+    query whose embedding is close enough to a previously answered one and
+    which mentions the same numbers (e.g. "FY24" never matches "FY25")
+    """
+    
+    def __init__(self, threshold: float = 0.95, maxsize: int = 256):
+        """
+        Initialize semantic cache
+        
+        Args:
+            threshold: Minimum cosine similarity for a semantic hit
+            maxsize: Maximum number of cached queries (least recent evicted)
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._exact = OrderedDict()
+        self._queries = []
+        self._query_numbers = []
+        self._vectors = None  # (n, d) matrix of L2-normalized query embeddings
+        self._lock = threading.Lock()
+    
+    def _embed(self, query: str) -> np.ndarray:
+        """Embed and L2-normalize a query"""
+        vector = np.asarray(get_embeddings().embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def get(self, query: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Look up a cached answer
+        
+        Args:
+            query: Query text
+        
+        Returns:
+            Tuple of (cached answer or None on a miss, query embedding if one
+            was computed), so a following put() needn't embed the query again
+        """
+        with self._lock:
+            if query in self._exact:
+                self._exact.move_to_end(query)
+                return self._exact[query], None
+            if not self._queries:
+                return None, None
+        
+        vector = self._embed(query)
+        
+        numbers = _numbers(query)
+        
+        with self._lock:
+            if not self._queries:
+                return None, vector
+            same_numbers = np.array([n == numbers for n in self._query_numbers])
+            if not same_numbers.any():
+                return None, vector
+            similarities = np.where(same_numbers, self._vectors @ vector, -np.inf)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None, vector
+            match = self._queries[best]
+            logger.info(f"Semantic cache hit ({similarities[best]:.3f}): {match[:80]}")
+            self._exact.move_to_end(match)
+            return self._exact[match], vector
+    
+    def put(self, query: str, answer: str, vector: Optional[np.ndarray] = None):
+        """
+        Store an answer
+        
+        Args:
+            query: Query text
+            answer: Answer to return for this and similar queries
+            vector: Query embedding returned by get(), if any
+        """
+        if vector is None:
+            vector = self._embed(query)
+        
+        with self._lock:
+            if query in self._exact:
+                self._exact[query] = answer
+                self._exact.move_to_end(query)
+                return
+            
+            if len(self._exact) >= self.maxsize:
+                oldest, _ = self._exact.popitem(last=False)
+                index = self._queries.index(oldest)
+                self._queries.pop(index)
+                self._query_numbers.pop(index)
+                self._vectors = np.delete(self._vectors, index, axis=0)
+            
+            self._exact[query] = answer
+            self._queries.append(query)
+            self._query_numbers.append(_numbers(query))
+            self._vectors = (
+                vector[np.newaxis, :] if self._vectors is None
+                else np.vstack([self._vectors, vector])
+            )
@@ -2,13 +2,23 @@
 Document Loading Utilities
 Handles loading and parsing of PDF and text documents
 """
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_community.document_loaders import PyMuPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
+from typing import Optional
+import hashlib
 import logging
+import os
+import pickle
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Split chunks are cached here keyed on file content; delete to flush
+DOC_CACHE_DIR = Path(".cache/docs")
+
 
 class DocumentLoader:
     """Utility class for loading and splitting documents"""
@@ -21,46 +31,106 @@ class DocumentLoader:
             chunk_size: Size of text chunks for splitting
             chunk_overlap: Overlap between chunks
         """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             separators=["\n\n", "\n", " ", ""]
         )
     
-    def load_pdf(self, file_path: str):
+    @staticmethod
+    def content_hash(file_path: str) -> str:
+        """
+        Hash the bytes of a document
+        
+        Args:
+            file_path: Path to document
+        
+        Returns:
+            Hex digest of the document content
+        """
+        return hashlib.blake2b(Path(file_path).read_bytes(), digest_size=16).hexdigest()
+    
+    def _cache_path(self, file_path: str, loader_name: str,
+                    content_hash: Optional[str] = None) -> Path:
+        """
+        Get the chunk cache file for a document
+        
+        Args:
+            file_path: Path to document
+            loader_name: Loader class name, so a loader change invalidates entries
+            content_hash: Precomputed content_hash() of the document, if any
+        
+        Returns:
+            Cache file path keyed on content, loader and splitter settings
+        """
+        content_hash = content_hash or self.content_hash(file_path)
+        return DOC_CACHE_DIR / (
+            f"{content_hash}-{loader_name}-{self.chunk_size}-{self.chunk_overlap}.pkl"
+        )
+    
+    def _load_cached(self, file_path: str, loader_cls, content_hash: Optional[str] = None):
+        """
+        Load and split a document, reusing previously split chunks
+        
+        Args:
+            file_path: Path to document
+            loader_cls: LangChain document loader class
+            content_hash: Precomputed content_hash() of the document, if any
+        
+        Returns:
+            List of document chunks
+        """
+        cache_path = self._cache_path(file_path, loader_cls.__name__, content_hash)
+        if cache_path.exists():
+            return pickle.loads(cache_path.read_bytes())
+        
+        documents = loader_cls(file_path).load()
+        chunks = self.text_splitter.split_documents(documents)
+        
+        # Write atomically so parallel loads never read a partial file
+        DOC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(
+            f".{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_bytes(pickle.dumps(chunks, protocol=5))
+        os.replace(tmp_path, cache_path)
+        
+        return chunks
+    
+    def load_pdf(self, file_path: str, content_hash: Optional[str] = None):
         """
         Load and split PDF document
         
         Args:
             file_path: Path to PDF file
+            content_hash: Precomputed content_hash() of the file, if any
         
         Returns:
             List of document chunks
         """
         try:
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
-            chunks = self.text_splitter.split_documents(documents)
+            chunks = self._load_cached(file_path, PyMuPDFLoader, content_hash)
             logger.info(f"Loaded PDF: {file_path} ({len(chunks)} chunks)")
             return chunks
         except Exception as e:
             logger.error(f"Error loading PDF {file_path}: {e}")
             return []
     
-    def load_text(self, file_path: str):
+    def load_text(self, file_path: str, content_hash: Optional[str] = None):
         """
         Load and split text document
         
         Args:
             file_path: Path to text file
+            content_hash: Precomputed content_hash() of the file, if any
         
         Returns:
             List of document chunks
         """
         try:
-            loader = TextLoader(file_path)
-            documents = loader.load()
-            chunks = self.text_splitter.split_documents(documents)
+            chunks = self._load_cached(file_path, TextLoader, content_hash)
             logger.info(f"Loaded text: {file_path} ({len(chunks)} chunks)")
             return chunks
         except Exception as e:
@@ -71,6 +141,8 @@ class DocumentLoader:
         """
         Load all documents of specified type from directory
         
+        Files are parsed in parallel; chunks are returned in file name order.
+        
         Args:
             directory_path: Path to directory
             file_extension: File extension to filter
@@ -85,12 +157,13 @@ class DocumentLoader:
             logger.warning(f"Directory not found: {directory_path}")
             return all_chunks
         
-        for file_path in directory.glob(f"*{file_extension}"):
-            if file_extension == ".pdf":
-                chunks = self.load_pdf(str(file_path))
-            else:
-                chunks = self.load_text(str(file_path))
-            all_chunks.extend(chunks)
+        file_paths = sorted(str(p) for p in directory.glob(f"*{file_extension}"))
+        load = self.load_pdf if file_extension == ".pdf" else self.load_text
+        workers = max(1, min(8, os.cpu_count() or 1, len(file_paths)))
+        
+        # The text splitter is stateless, so files can be loaded concurrently
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            all_chunks = list(chain.from_iterable(executor.map(load, file_paths)))
         
         logger.info(f"Loaded {len(all_chunks)} total chunks from {directory_path}")
         return all_chunks
\ No newline at end of file
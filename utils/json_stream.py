@@ -0,0 +1,91 @@
+"""
+JSON Streaming Utilities
+Stops LLM generation as soon as a complete JSON object has been produced
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PartialStreamError(RuntimeError):
+    """Raised when a stream fails after some output was already generated"""
+
+
+class JsonObjectTracker:
+    """Tracks brace depth across streamed text to detect a closed top-level object"""
+    
+    def __init__(self):
+        """Initialize tracker state"""
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.complete = False
+    
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next piece of streamed text
+        
+        Args:
+            text: Next token(s) from the LLM
+        
+        Returns:
+            True once the first top-level JSON object has been closed
+        """
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.depth > 0:
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}' and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    break
+        return self.complete
+
+
+def _token_text(chunk) -> str:
+    """Get text from a streamed chunk (message chunk or plain string)"""
+    return chunk.content if hasattr(chunk, 'content') else str(chunk)
+
+
+def stream_json_object(llm, prompt) -> str:
+    """
+    Stream an LLM response, stopping once a JSON object is complete
+    
+    Args:
+        llm: LangChain chat model, or a runnable chain ending in one
+        prompt: Prompt text, or the chain's input
+    
+    Returns:
+        Text generated up to and including the closing brace
+    
+    Raises:
+        PartialStreamError: If the stream fails after yielding output, so
+            callers can tell a mid-generation failure from no streaming support
+    """
+    tracker = JsonObjectTracker()
+    chunks = []
+    
+    stream = llm.stream(prompt)
+    try:
+        for chunk in stream:
+            chunks.append(_token_text(chunk))
+            if tracker.feed(chunks[-1]):
+                logger.debug("JSON object complete, stopping stream")
+                break
+    except Exception as e:
+        if chunks:
+            raise PartialStreamError(f"Stream failed mid-generation: {e}") from e
+        raise
+    finally:
+        stream.close()
+    
+    return "".join(chunks)
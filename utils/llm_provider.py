@@ -6,17 +6,32 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.chat_models import ChatOllama
 from app.config import settings
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+OPENAI_MODEL = "gpt-4o-mini"
 
-def get_llm(temperature: float = 0.0):
+# Fixed Ollama context window, so the model isn't reloaded between requests
+OLLAMA_NUM_CTX = 4096
+
+# Context window of OPENAI_MODEL, in tokens
+OPENAI_CONTEXT_WINDOW = 128000
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+HF_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=8)
+def get_llm(temperature: float = 0.0, json_mode: bool = False):
     """
     Get LLM instance based on configuration
+    Instances are cached per settings and shared across callers
     
     Args:
         temperature: Controls randomness (0.0 = deterministic)
+        json_mode: Constrain output to a valid JSON object server-side
     
     Returns:
         LLM instance (OpenAI or Ollama)
@@ -24,37 +39,66 @@ def get_llm(temperature: float = 0.0):
     if settings.use_openai:
         logger.info("Using OpenAI as LLM provider")
         return ChatOpenAI(
-            model="gpt-4o-mini",
+            model=get_model_name(),
             temperature=temperature,
-            api_key=settings.openai_api_key
+            api_key=settings.openai_api_key,
+            model_kwargs={"response_format": {"type": "json_object"}} if json_mode else {}
         )
     else:
         logger.info(f"Using Ollama ({settings.ollama_model}) as LLM provider")
         return ChatOllama(
             base_url=settings.ollama_base_url,
             model=settings.ollama_model,
-            temperature=temperature
+            temperature=temperature,
+            num_ctx=OLLAMA_NUM_CTX,
+            format="json" if json_mode else None
         )
 
 
+@lru_cache(maxsize=1)
 def get_embeddings():
     """
     Get embeddings model
     Uses OpenAI embeddings if API key provided, otherwise local embeddings
+    The model is loaded once and shared across callers
     
     Returns:
         Embeddings instance
     """
     if settings.use_openai:
         logger.info("Using OpenAI embeddings")
-        return OpenAIEmbeddings(api_key=settings.openai_api_key)
+        return OpenAIEmbeddings(
+            model=OPENAI_EMBEDDING_MODEL,
+            api_key=settings.openai_api_key
+        )
     else:
-        logger.info("Using local HuggingFace embeddings")
+        import torch
+        
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info(f"Using local HuggingFace embeddings ({device})")
         return HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+            model_name=HF_EMBEDDING_MODEL,
+            model_kwargs={"device": device},
+            encode_kwargs={"normalize_embeddings": True, "batch_size": 128}
         )
 
 
+@lru_cache(maxsize=1)
 def get_provider_name() -> str:
     """Get the name of current LLM provider"""
-    return "openai" if settings.use_openai else "ollama"
\ No newline at end of file
+    return "openai" if settings.use_openai else "ollama"
+
+
+def get_embedding_model_name() -> str:
+    """Get the name of the embedding model used by the current provider"""
+    return OPENAI_EMBEDDING_MODEL if settings.use_openai else HF_EMBEDDING_MODEL
+
+
+def get_model_name() -> str:
+    """Get the name of the model used by the current LLM provider"""
+    return OPENAI_MODEL if settings.use_openai else settings.ollama_model
+
+
+def get_context_window() -> int:
+    """Get the context window (in tokens) of the current LLM"""
+    return OPENAI_CONTEXT_WINDOW if settings.use_openai else OLLAMA_NUM_CTX
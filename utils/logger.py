@@ -5,6 +5,12 @@ Provides additional logging functionality
 import logging
 from app.config import settings
 
+# Shared console handler, built once rather than on every setup_logger call
+_HANDLER = logging.StreamHandler()
+_HANDLER.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+))
+
 
 def setup_logger(name: str) -> logging.Logger:
     """
@@ -19,14 +25,7 @@ def setup_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, settings.log_level))
     
-    # Create console handler with formatting
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    
     if not logger.handlers:
-        logger.addHandler(handler)
+        logger.addHandler(_HANDLER)
     
     return logger
\ No newline at end of file